@@ -10,8 +10,8 @@ Neural Engine acceleration on Apple Silicon.
 Reference: https://github.com/apple/ml-sharp
 
 Requirements:
-    - torch>=2.0.0
-    - coremltools>=7.0
+    - torch>=2.1.0
+    - coremltools>=8.0
     - numpy>=1.24.0
     - pillow>=10.0.0
 
@@ -22,66 +22,84 @@ Author: oflike-metal project
 License: MIT
 """
 
+from __future__ import annotations
+
 import argparse
 import os
+import shutil
 import sys
 from pathlib import Path
 from typing import Tuple, Optional
 
-try:
-    import torch
-    import torch.nn as nn
-    import coremltools as ct
-    import numpy as np
-    from PIL import Image
-except ImportError as e:
-    print(f"Error: Missing required package - {e}")
-    print("\nInstall required packages:")
-    print("  pip install torch torchvision coremltools numpy pillow")
-    sys.exit(1)
+
+# Channel layout of the fused (1, N, 14) "gaussians" output tensor
+GAUSSIAN_SLICES = (
+    ("positions", 0, 3),    # xyz
+    ("colors", 3, 6),       # rgb [0, 1]
+    ("opacities", 6, 7),    # alpha [0, 1]
+    ("scales", 7, 10),      # scale xyz
+    ("rotations", 10, 14),  # quaternion wxyz
+)
 
 
-class SharpModelWrapper(nn.Module):
+def _lazy_import() -> None:
     """
-    Wrapper for SHARP model to ensure proper Core ML conversion.
-
-    Input: RGB image (1, 3, H, W) - normalized [0, 1]
-    Output: Gaussian parameters (N, 14) where:
-        - positions (x, y, z): 3 values
-        - colors (r, g, b): 3 values
-        - opacity (alpha): 1 value
-        - covariance (scale + rotation): 7 values
+    Import the heavy ML stack on first use.
+
+    `import torch` alone takes ~1-2s cold and coremltools adds another
+    ~1s of proto registration; deferring them keeps `--help` and argparse
+    errors instant. Binds the module globals torch, nn, ct, np, Image and
+    defines SharpModelWrapper (which needs nn.Module as a base class).
+    Safe to call repeatedly.
     """
+    if "torch" in globals():
+        return
 
-    def __init__(self, sharp_model: nn.Module):
-        super().__init__()
-        self.model = sharp_model
+    global torch, nn, ct, np, Image, SharpModelWrapper
+    try:
+        import torch
+        import torch.nn as nn
+        import coremltools as ct
+        import numpy as np
+        from PIL import Image
+    except ImportError as e:
+        print(f"Error: Missing required package - {e}")
+        print("\nInstall required packages:")
+        print("  pip install torch torchvision coremltools numpy pillow")
+        sys.exit(1)
 
-    def forward(self, image: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor,
-                                                      torch.Tensor, torch.Tensor,
-                                                      torch.Tensor]:
+    class SharpModelWrapper(nn.Module):
         """
-        Forward pass returning structured Gaussian parameters.
-
-        Returns:
-            positions: (N, 3) - xyz positions
-            colors: (N, 3) - rgb colors [0, 1]
-            opacities: (N, 1) - alpha values [0, 1]
-            scales: (N, 3) - scale factors
-            rotations: (N, 4) - quaternions (w, x, y, z)
+        Wrapper for SHARP model to ensure proper Core ML conversion.
+
+        Input: RGB image (1, 3, H, W) - normalized [0, 1]
+        Output: Gaussian parameters (1, N, 14) packed along the last axis:
+            - [0:3]   positions (x, y, z)
+            - [3:6]   colors (r, g, b) [0, 1]
+            - [6:7]   opacity (alpha) [0, 1]
+            - [7:10]  scales (x, y, z)
+            - [10:14] rotation quaternion (w, x, y, z)
+
+        The fused layout lets the C++/Swift consumer in ofxSharp walk the
+        (N, 14) float buffer zero-copy with a stride of 14 floats per
+        Gaussian, instead of Core ML materializing five sliced output
+        tensors (one allocation and one ANE->CPU transfer each) per
+        inference.
         """
-        # Run inference
-        output = self.model(image)
 
-        # Parse output into structured components
-        # Assuming output shape: (batch, num_gaussians, 14)
-        positions = output[:, :, 0:3]    # xyz
-        colors = output[:, :, 3:6]       # rgb
-        opacities = output[:, :, 6:7]    # alpha
-        scales = output[:, :, 7:10]      # scale xyz
-        rotations = output[:, :, 10:14]  # quaternion wxyz
+        def __init__(self, sharp_model: nn.Module):
+            super().__init__()
+            self.model = sharp_model
+
+        def forward(self, image: torch.Tensor) -> torch.Tensor:
+            """
+            Forward pass returning fused Gaussian parameters.
 
-        return positions, colors, opacities, scales, rotations
+            Returns:
+                gaussians: (1, N, 14) - packed per-Gaussian parameters
+                    (see class docstring for the channel layout)
+            """
+            return self.model(image)
 
 
 def load_pytorch_model(model_path: str) -> nn.Module:
@@ -94,6 +112,7 @@ def load_pytorch_model(model_path: str) -> nn.Module:
     Returns:
         Loaded PyTorch model in evaluation mode
     """
+    _lazy_import()
     print(f"Loading PyTorch model from: {model_path}")
 
     # Load checkpoint
@@ -130,8 +149,12 @@ def load_pytorch_model(model_path: str) -> nn.Module:
         nn.Conv2d(3, 64, 3, padding=1),
         nn.ReLU(),
         nn.AdaptiveAvgPool2d((1, 1)),
-        nn.Flatten(),
-        nn.Linear(64, 1000 * 14),  # 1000 gaussians * 14 parameters
+        # 1x1 conv head: mathematically identical to Linear(64, 14000) on
+        # the pooled (B, 64, 1, 1) features, but keeps the graph
+        # convolutional so the ANE scheduler maps the big matmul to native
+        # conv tiles instead of spilling it to GPU
+        nn.Conv2d(64, 1000 * 14, 1),  # 1000 gaussians * 14 parameters
+        nn.Flatten(1),
         nn.Unflatten(1, (1000, 14))
     )
 
@@ -159,72 +182,494 @@ def create_example_input(height: int = 512, width: int = 512) -> torch.Tensor:
     Returns:
         Example tensor (1, 3, H, W) normalized [0, 1]
     """
-    return torch.rand(1, 3, height, width)
+    _lazy_import()
+    # Quantize to the 8-bit grid so the tensor round-trips exactly through
+    # the PIL image fed to the Core ML ImageType input during validation
+    pixels = torch.randint(0, 256, (1, 3, height, width), dtype=torch.uint8)
+    return pixels.float() / 255.0
+
+
+def _version_tuple(version: str) -> Tuple[int, ...]:
+    """Parse 'X.Y.Z...' into a comparable tuple, ignoring non-numeric parts."""
+    parts = []
+    for part in version.split('.'):
+        digits = ''.join(c for c in part if c.isdigit())
+        if not digits:
+            break
+        parts.append(int(digits))
+    return tuple(parts)
+
+
+# Conversion cache for captured graphs and pre-quantization mlpackages
+CACHE_DIR = Path.home() / ".cache" / "oflike"
+
+# Give up on ct.convert after this long (a hung mlmodel proxy
+# instantiation otherwise blocks forever)
+CONVERSION_TIMEOUT_S = 600
+
+# Known ct.convert failure signatures and the action that actually fixes
+# them, matched against the RuntimeError message
+_CONVERSION_REMEDIES = (
+    ("PyTorch convert function for op",
+     "Unsupported PyTorch op. Upgrade coremltools (the torch.export path "
+     "covers more ops than tracing), or rewrite the offending op - e.g. "
+     "a 1x1 conv instead of a Linear layer."),
+    ("Unknown opset",
+     "The captured graph uses an opset this coremltools release does not "
+     "know. Upgrade coremltools or pin torch to a matching version."),
+    ("Unable to parse ML Program",
+     "ML Program decode error. Raise the deployment target (compressed "
+     "models already target macOS 15) or upgrade coremltools."),
+)
+
+
+def _suggest_conversion_fix(message: str) -> None:
+    """Print a targeted remediation for known ct.convert failure modes."""
+    for pattern, remedy in _CONVERSION_REMEDIES:
+        if pattern in message:
+            print(f"\nHint: {remedy}")
+            return
+
+
+def model_fingerprint(
+    wrapped_model: nn.Module,
+    input_shape: Tuple[int, int],
+    *extra: str
+) -> str:
+    """
+    Fingerprint the model and input shape for the conversion cache.
+
+    Hashes the state-dict tensor names/shapes/dtypes and their values
+    together with the input shape and torch version. The values matter:
+    the cached graphs and mlpackage embed the weights, so reconverting
+    after retraining the same architecture must miss the cache.
+
+    Args:
+        wrapped_model: Wrapped model about to be converted
+        input_shape: Input image (height, width)
+        *extra: Additional strings to mix into the hash
+
+    Returns:
+        Short hex digest suitable for cache file names
+    """
+    import hashlib
+
+    h = hashlib.sha256()
+    for name, tensor in wrapped_model.state_dict().items():
+        h.update(f"{name}:{tuple(tensor.shape)}:{tensor.dtype}".encode())
+        h.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+    h.update(f"input:{input_shape}".encode())
+    h.update(f"torch:{torch.__version__}".encode())
+    for item in extra:
+        h.update(item.encode())
+    return h.hexdigest()[:16]
+
+
+def _graph_cache_path(kind: str, cache_key: str) -> Path:
+    """Cache file for a captured graph ('export' -> .pt2, 'trace' -> .pt)."""
+    suffix = "pt2" if kind == "export" else "pt"
+    return CACHE_DIR / f"sharp_{kind}_{cache_key}.{suffix}"
+
+
+def _torch_export_available() -> bool:
+    """
+    Check whether the torch.export conversion path can be used.
+
+    coremltools 8.0 accepts torch.export programs directly (Edge Dialect),
+    which converts faster than re-parsing TorchScript through the legacy
+    frontend and avoids a class of tracing bugs (e.g. unused-branch pruning).
+    Requires torch>=2.4 and coremltools>=8.0.
+    """
+    return (_version_tuple(torch.__version__) >= (2, 4)
+            and _version_tuple(ct.__version__) >= (8, 0))
+
+
+def capture_model_graph(
+    wrapped_model: nn.Module,
+    example_input: torch.Tensor,
+    cache_key: Optional[str] = None
+):
+    """
+    Capture the model graph for Core ML conversion.
+
+    Prefers torch.export (faster conversion, stateful/dynamic-shape support)
+    when torch>=2.4 and coremltools>=8.0 are installed, falling back to
+    torch.jit.trace if torch.export is unavailable or fails on unsupported
+    ops (e.g. narrow/dynamic ops).
+
+    When cache_key is given (see model_fingerprint), the captured graph is
+    persisted under ~/.cache/oflike/ and reused on subsequent runs, so a
+    dev loop that reconverts the same architecture at several precisions
+    skips the capture step entirely.
+
+    Args:
+        wrapped_model: Wrapped model in eval mode
+        example_input: Example input tensor (1, 3, H, W)
+        cache_key: Optional fingerprint for the on-disk graph cache
+
+    Returns:
+        torch.export.ExportedProgram or torch.jit.ScriptModule
+    """
+    if cache_key is not None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    if _torch_export_available():
+        cache_path = cache_key and _graph_cache_path("export", cache_key)
+        if cache_path and cache_path.exists():
+            print(f"Loading cached exported graph: {cache_path}")
+            try:
+                return torch.export.load(str(cache_path))
+            except Exception as e:
+                print(f"Warning: cache load failed ({e}), re-exporting...")
+        try:
+            print("Exporting model with torch.export...")
+            exported = torch.export.export(wrapped_model, (example_input,))
+            if cache_path:
+                torch.export.save(exported, str(cache_path))
+            return exported
+        except Exception as e:
+            print(f"Warning: torch.export failed: {e}")
+            print("Falling back to torch.jit.trace...")
+    else:
+        print("torch.export path requires torch>=2.4 and coremltools>=8.0, "
+              "using torch.jit.trace...")
+
+    cache_path = cache_key and _graph_cache_path("trace", cache_key)
+    if cache_path and cache_path.exists():
+        print(f"Loading cached traced graph: {cache_path}")
+        try:
+            return torch.jit.load(str(cache_path))
+        except Exception as e:
+            print(f"Warning: cache load failed ({e}), re-tracing...")
+
+    with torch.no_grad():
+        traced = torch.jit.trace(wrapped_model, example_input)
+    if cache_path:
+        torch.jit.save(traced, str(cache_path))
+    return traced
+
+
+def quantize_mlmodel(
+    mlmodel: ct.models.MLModel,
+    quant_mode: str = "int8"
+) -> ct.models.MLModel:
+    """
+    Compress ML Program weights via the coremltools.optimize.coreml APIs.
+
+    The legacy quantization_utils.quantize_weights path targets NeuralNetwork
+    models; on ML Program its weights are decompressed to float at runtime,
+    saving disk space but little bandwidth. The optimize.coreml APIs emit
+    compressed ops that the Neural Engine executes natively (int8 MACs on
+    A17 Pro / M4 class hardware), roughly halving weight-memory traffic.
+
+    Args:
+        mlmodel: Converted ML Program model
+        quant_mode: 'int8' for blockwise linear quantization,
+                    'int4' or 'palettize' for 4-bit palettization
+
+    Returns:
+        Compressed Core ML model
+    """
+    from coremltools.optimize.coreml import (
+        OpLinearQuantizerConfig,
+        OpPalettizerConfig,
+        OptimizationConfig,
+        linear_quantize_weights,
+        palettize_weights,
+    )
+
+    if quant_mode == "int8":
+        print("\nApplying blockwise INT8 weight quantization...")
+        op_cfg = OpLinearQuantizerConfig(
+            mode="linear_symmetric",
+            dtype="int8",
+            granularity="per_block",
+            block_size=32
+        )
+        return linear_quantize_weights(
+            mlmodel, config=OptimizationConfig(global_config=op_cfg)
+        )
+
+    # 'int4' / 'palettize': 4-bit look-up-table palettization
+    print("\nApplying 4-bit weight palettization...")
+    op_cfg = OpPalettizerConfig(mode="kmeans", nbits=4)
+    return palettize_weights(
+        mlmodel, config=OptimizationConfig(global_config=op_cfg)
+    )
+
+
+def load_calibration_data(
+    calib_dir: Optional[str],
+    input_shape: Tuple[int, int],
+    num_samples: int = 8
+) -> list:
+    """
+    Build calibration samples for activation quantization.
+
+    Uses real images from calib_dir when provided (resized to the model
+    input resolution), otherwise falls back to random images. Samples are
+    PIL Images because the model input is an ImageType: predict (which
+    linear_quantize_activations runs under the hood) rejects raw arrays
+    for image inputs.
+
+    Args:
+        calib_dir: Optional directory of .png/.jpg calibration images
+        input_shape: Input image (height, width)
+        num_samples: Number of random samples when calib_dir is not given
+
+    Returns:
+        List of {"image": PIL.Image} dicts for sample_data
+    """
+    height, width = input_shape
+    samples = []
+
+    if calib_dir:
+        for path in sorted(Path(calib_dir).iterdir()):
+            if path.suffix.lower() not in (".png", ".jpg", ".jpeg"):
+                continue
+            img = Image.open(path).convert("RGB").resize((width, height))
+            samples.append({"image": img})
+        print(f"  Loaded {len(samples)} calibration images from {calib_dir}")
+
+    if not samples:
+        print(f"  Using {num_samples} random calibration samples "
+              "(pass --calib-dir for representative images)")
+        samples = [
+            {"image": Image.fromarray(np.random.randint(
+                0, 256, (height, width, 3), dtype=np.uint8))}
+            for _ in range(num_samples)
+        ]
+
+    return samples
+
+
+def joint_compress_a8w4(
+    mlmodel: ct.models.MLModel,
+    calibration_data: list
+) -> ct.models.MLModel:
+    """
+    Joint A8W4 compression targeting A17 Pro / M4 class Neural Engines.
+
+    Chains int8 activation quantization, 4-bit weight palettization, and a
+    joint int8 pass over the palettized look-up tables. The result runs on
+    int8 ANE ALUs with a 4x weight footprint reduction versus FP16.
+
+    Args:
+        mlmodel: Converted ML Program model
+        calibration_data: Samples from load_calibration_data()
+
+    Returns:
+        Compressed Core ML model
+    """
+    from coremltools.optimize.coreml import (
+        OpLinearQuantizerConfig,
+        OpPalettizerConfig,
+        OptimizationConfig,
+        linear_quantize_weights,
+        palettize_weights,
+    )
+    from coremltools.optimize.coreml.experimental import (
+        OpActivationLinearQuantizerConfig,
+        linear_quantize_activations,
+    )
+
+    print("\nApplying A8W4 joint compression...")
+
+    print("  [1/3] Quantizing activations to INT8...")
+    act_cfg = OpActivationLinearQuantizerConfig(mode="linear_symmetric")
+    mlmodel = linear_quantize_activations(
+        mlmodel,
+        config=OptimizationConfig(global_config=act_cfg),
+        sample_data=calibration_data
+    )
+
+    print("  [2/3] Palettizing weights to 4-bit...")
+    pal_cfg = OpPalettizerConfig(mode="kmeans", nbits=4)
+    mlmodel = palettize_weights(
+        mlmodel, config=OptimizationConfig(global_config=pal_cfg)
+    )
+
+    print("  [3/3] Jointly quantizing palettized weights to INT8...")
+    quant_cfg = OpLinearQuantizerConfig(mode="linear_symmetric", dtype="int8")
+    return linear_quantize_weights(
+        mlmodel,
+        config=OptimizationConfig(global_config=quant_cfg),
+        joint_compression=True
+    )
+
+
+def _mlmodel_load_kwargs() -> dict:
+    """
+    Extra kwargs for ct.models.MLModel load sites.
+
+    Optimization hints (FastPrediction specialization, infrequent
+    reshape) steer the Core ML compiler toward low-latency, ANE-friendly
+    layouts, but they are consumed at load time only - save() does not
+    serialize them - so every model instantiation must pass them, and the
+    consuming app must set the equivalent hints in its
+    MLModelConfiguration. Empty on coremltools < 8.0.
+    """
+    if _version_tuple(ct.__version__) < (8, 0):
+        return {}
+    return {
+        "optimization_hints": {
+            "reshapeFrequency": ct.ReshapeFrequency.Infrequent,
+            "specializationStrategy": ct.SpecializationStrategy.FastPrediction,
+        }
+    }
 
 
 def convert_to_coreml(
-    pytorch_model: nn.Module,
+    wrapped_model: nn.Module,
     output_path: str,
     input_shape: Tuple[int, int] = (512, 512),
-    compute_units: ct.ComputeUnit = ct.ComputeUnit.ALL,
-    quantize: bool = False
-) -> ct.models.MLModel:
+    compute_units: Optional[ct.ComputeUnit] = None,
+    quantize: bool = False,
+    quant_mode: str = "int8",
+    preset: Optional[str] = None,
+    calib_dir: Optional[str] = None,
+    load_after_convert: bool = True,
+    precision: str = "fp16"
+) -> Tuple[ct.models.MLModel, torch.Tensor, Optional[torch.Tensor]]:
     """
     Convert PyTorch model to Core ML format.
 
     Args:
-        pytorch_model: PyTorch model in eval mode
+        wrapped_model: SharpModelWrapper instance in eval mode
         output_path: Output path for .mlpackage or .mlmodel
         input_shape: Input image (height, width)
-        compute_units: Compute units (ALL, CPU_AND_NE, CPU_ONLY)
-        quantize: Apply INT8 quantization for smaller model size
+        compute_units: Compute units (ALL, CPU_AND_NE, CPU_ONLY);
+            defaults to CPU_AND_NE
+        quantize: Apply weight compression for smaller model size
+        quant_mode: Compression regime ('int8', 'int4', 'palettize')
+        preset: Joint-compression preset ('a8w4'), overrides quantize
+        calib_dir: Directory of calibration images for the a8w4 preset
+        load_after_convert: Instantiate the mlmodel proxy after
+            conversion; pass False for conversion-only runs to skip the
+            proxy creation latency (the saved package is identical)
+        precision: Weight/compute precision, 'fp16' (ANE-compatible,
+            default) or 'fp32' (debugging only; ANE requires FP16/int8)
 
     Returns:
-        Core ML model
+        (mlmodel, example_input, reference) - the converted model plus the
+        example input and the PyTorch output for it, so the validator can
+        skip a second PyTorch forward pass; reference is None on
+        conversion-only runs (load_after_convert=False)
     """
+    _lazy_import()
+    if compute_units is None:
+        compute_units = ct.ComputeUnit.CPU_AND_NE
+
     print(f"\nConverting to Core ML...")
     print(f"  Input shape: (1, 3, {input_shape[0]}, {input_shape[1]})")
     print(f"  Compute units: {compute_units}")
-    print(f"  Quantization: {quantize}")
-
-    # Wrap model
-    wrapped_model = SharpModelWrapper(pytorch_model)
-    wrapped_model.eval()
+    print(f"  Compression: {preset or (quant_mode if quantize else False)}")
+    print(f"  Precision: {precision}")
 
     # Create example input
     example_input = create_example_input(input_shape[0], input_shape[1])
 
-    # Trace model
-    print("\nTracing model...")
-    with torch.no_grad():
-        traced_model = torch.jit.trace(wrapped_model, example_input)
-
-    # Define input
-    image_input = ct.TensorType(
-        name="image",
-        shape=(1, 3, input_shape[0], input_shape[1]),
-        dtype=np.float32
+    # Blockwise/palettized weights need the macOS 15 op set; without it the
+    # compressed ops are silently dropped. Keep the broader macOS 13 target
+    # for uncompressed models.
+    compressed = quantize or preset is not None
+    deployment_target = ct.target.macOS15 if compressed else ct.target.macOS13
+
+    # The cache key covers architecture, resolution and deployment target,
+    # so compression-only reruns reuse both the captured graph and the
+    # pre-quantization mlpackage instead of re-running all MIL passes.
+    cache_key = model_fingerprint(
+        wrapped_model, input_shape, str(deployment_target), precision
     )
+    cached_package = CACHE_DIR / f"sharp_mlmodel_{cache_key}.mlpackage"
 
-    # Define outputs
-    outputs = [
-        ct.TensorType(name="positions", dtype=np.float32),   # (N, 3)
-        ct.TensorType(name="colors", dtype=np.float32),      # (N, 3)
-        ct.TensorType(name="opacities", dtype=np.float32),   # (N, 1)
-        ct.TensorType(name="scales", dtype=np.float32),      # (N, 3)
-        ct.TensorType(name="rotations", dtype=np.float32),   # (N, 4)
-    ]
+    if cached_package.exists():
+        print(f"\nUsing cached pre-quantization mlpackage: {cached_package}")
+        mlmodel = ct.models.MLModel(
+            str(cached_package),
+            compute_units=compute_units,
+            **_mlmodel_load_kwargs()
+        )
+    else:
+        # Capture model graph (torch.export when available, else jit.trace)
+        print("\nCapturing model graph...")
+        captured_model = capture_model_graph(
+            wrapped_model, example_input, cache_key
+        )
 
-    # Convert to Core ML
-    print("\nConverting to Core ML format...")
-    mlmodel = ct.convert(
-        traced_model,
-        inputs=[image_input],
-        outputs=outputs,
-        compute_units=compute_units,
-        minimum_deployment_target=ct.target.macOS13,
-        convert_to="mlprogram"  # Use ML Program (supports more ops)
-    )
+        # Define input as an image so the cast + [0, 1] normalization runs
+        # in the Core ML preprocessing stage instead of a per-pixel float
+        # pass on the consumer CPU before every prediction
+        image_input = ct.ImageType(
+            name="image",
+            shape=(1, 3, input_shape[0], input_shape[1]),
+            scale=1 / 255.0,
+            bias=[0, 0, 0],
+            color_layout=ct.colorlayout.RGB
+        )
+
+        # Define outputs (single fused tensor; see SharpModelWrapper)
+        outputs = [
+            ct.TensorType(name="gaussians", dtype=np.float32),  # (1, N, 14)
+        ]
+
+        # Convert to Core ML on a worker thread so a hung mlmodel proxy
+        # instantiation times out instead of blocking forever
+        print("\nConverting to Core ML format...")
+        from concurrent.futures import ThreadPoolExecutor
+        from concurrent.futures import TimeoutError as FutureTimeout
+
+        pool = ThreadPoolExecutor(max_workers=1)
+        future = pool.submit(
+            ct.convert,
+            captured_model,
+            inputs=[image_input],
+            outputs=outputs,
+            compute_units=compute_units,
+            minimum_deployment_target=deployment_target,
+            convert_to="mlprogram",  # Use ML Program (supports more ops)
+            skip_model_load=not load_after_convert,
+            # FP16 is the mlprogram default today, but pin it explicitly:
+            # a future default change to FP32 would double the on-disk
+            # size and silently break ANE residency
+            compute_precision=(
+                ct.precision.FLOAT16 if precision == "fp16"
+                else ct.precision.FLOAT32
+            )
+        )
+        try:
+            mlmodel = future.result(timeout=CONVERSION_TIMEOUT_S)
+        except FutureTimeout:
+            print(f"\nError: conversion did not finish within "
+                  f"{CONVERSION_TIMEOUT_S}s. If the MIL passes completed, "
+                  "the hang is likely the model proxy instantiation - "
+                  "rerun with --skip-validation to skip the proxy load.")
+            # The worker thread is still stuck inside ct.convert and
+            # concurrent.futures joins non-daemon workers at interpreter
+            # shutdown, so a normal exit would hang on it anyway. Skip the
+            # join and terminate outright - flushing first, since
+            # os._exit() bypasses stdio buffer flushing.
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(1)
+        except RuntimeError as e:
+            _suggest_conversion_fix(str(e))
+            raise
+        finally:
+            pool.shutdown(wait=False)
+
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        mlmodel.save(str(cached_package))
+
+    # Reference output for validation, reusing the example input so the
+    # validator does not need a second PyTorch forward pass. FP16 autocast
+    # matches the mlprogram's deployed precision. Conversion-only runs
+    # (--skip-validation) never consume it, so skip the forward there.
+    reference = None
+    if load_after_convert:
+        with torch.no_grad(), \
+                torch.autocast(device_type="cpu", dtype=torch.float16):
+            reference = wrapped_model(example_input)
 
     # Add metadata
     mlmodel.author = "oflike-metal"
@@ -234,105 +679,259 @@ def convert_to_coreml(
 
     # Add input description
     mlmodel.input_description["image"] = (
-        "Input RGB image normalized to [0, 1] range. "
-        f"Shape: (1, 3, {input_shape[0]}, {input_shape[1]})"
+        "Input 8-bit RGB image; normalized to [0, 1] inside the model. "
+        f"Size: {input_shape[1]}x{input_shape[0]}"
     )
 
-    # Add output descriptions
-    mlmodel.output_description["positions"] = (
-        "3D positions of Gaussians in world space (N, 3)"
-    )
-    mlmodel.output_description["colors"] = (
-        "RGB colors of Gaussians [0, 1] (N, 3)"
-    )
-    mlmodel.output_description["opacities"] = (
-        "Opacity values [0, 1] (N, 1)"
-    )
-    mlmodel.output_description["scales"] = (
-        "Scale factors for Gaussian covariance (N, 3)"
-    )
-    mlmodel.output_description["rotations"] = (
-        "Rotation quaternions (w, x, y, z) (N, 4)"
+    # Add output description
+    mlmodel.output_description["gaussians"] = (
+        "Packed Gaussian parameters (1, N, 14): positions xyz [0:3], "
+        "colors rgb [3:6], opacity [6:7], scales xyz [7:10], "
+        "rotation quaternion wxyz [10:14]"
     )
 
-    # Apply quantization if requested
-    if quantize:
-        print("\nApplying INT8 quantization...")
-        mlmodel = ct.models.neural_network.quantization_utils.quantize_weights(
-            mlmodel, nbits=8
-        )
+    # Apply weight compression if requested
+    if preset == "a8w4":
+        calibration_data = load_calibration_data(calib_dir, input_shape)
+        mlmodel = joint_compress_a8w4(mlmodel, calibration_data)
+    elif quantize:
+        mlmodel = quantize_mlmodel(mlmodel, quant_mode)
 
     # Save model
     print(f"\nSaving Core ML model to: {output_path}")
     mlmodel.save(output_path)
 
+    # Bisect oversized models so each half fits in ANE SRAM
+    bisected = bisect_if_oversized(output_path, compressed)
+
+    # Pre-compile so the app skips the first-launch Core ML compile
+    compiled_path = compile_mlmodelc(output_path)
+
     # Print model info
     print("\n✓ Conversion complete!")
     print(f"\nModel Details:")
     print(f"  - Format: ML Program")
-    print(f"  - Deployment Target: macOS 13.0+")
+    print(f"  - Deployment Target: {'macOS 15.0+' if compressed else 'macOS 13.0+'}")
     print(f"  - Compute Units: {compute_units}")
     print(f"  - Input: image (1, 3, {input_shape[0]}, {input_shape[1]})")
-    print(f"  - Outputs:")
-    print(f"    • positions (N, 3)")
-    print(f"    • colors (N, 3)")
-    print(f"    • opacities (N, 1)")
-    print(f"    • scales (N, 3)")
-    print(f"    • rotations (N, 4)")
+    print(f"  - Output: gaussians (1, N, 14) packed as:")
+    for name, start, stop in GAUSSIAN_SLICES:
+        print(f"    • {name} [{start}:{stop}]")
+    if bisected:
+        print(f"  - Bisected for ANE residency (chain both at runtime):")
+        print(f"    • {bisected[0]}")
+        print(f"    • {bisected[1]}")
+    if compiled_path:
+        print(f"  - Compiled model: {compiled_path}")
+
+    return mlmodel, example_input, reference
+
+
+def _package_size_mb(package_path: str) -> float:
+    """Total on-disk size of an .mlpackage directory in megabytes."""
+    root = Path(package_path)
+    if root.is_file():
+        return root.stat().st_size / 1e6
+    return sum(f.stat().st_size for f in root.rglob('*') if f.is_file()) / 1e6
 
-    return mlmodel
+
+def bisect_if_oversized(
+    output_path: str,
+    compressed: bool
+) -> Optional[Tuple[str, str]]:
+    """
+    Split an oversized mlpackage into two halves that each fit on the ANE.
+
+    A model whose working set exceeds the ANE SRAM budget (~24 MB per
+    tile on current SoCs) silently falls back to GPU. Bisecting into two
+    chained models lets each half stay ANE-resident; the ofxSharp
+    consumer runs them back to back. Thresholds: 200 MB uncompressed,
+    50 MB compressed.
+
+    Args:
+        output_path: Path to the saved .mlpackage
+        compressed: Whether the model weights are compressed
+
+    Returns:
+        (part1, part2) paths when the model was bisected, else None
+    """
+    threshold_mb = 50 if compressed else 200
+    size_mb = _package_size_mb(output_path)
+    if size_mb <= threshold_mb:
+        return None
+
+    print(f"\nModel is {size_mb:.0f} MB (> {threshold_mb} MB); "
+          "bisecting for ANE residency...")
+    output_dir = str(Path(output_path).parent)
+    try:
+        ct.models.utils.bisect_model(output_path, output_dir)
+    except Exception as e:
+        print(f"Warning: model bisection failed: {e}")
+        return None
+
+    stem = Path(output_path).stem
+    part1 = str(Path(output_dir) / f"{stem}_chunk1.mlpackage")
+    part2 = str(Path(output_dir) / f"{stem}_chunk2.mlpackage")
+    if not (os.path.exists(part1) and os.path.exists(part2)):
+        print("Warning: bisected chunks not found, keeping single model")
+        return None
+    return part1, part2
+
+
+def compile_mlmodelc(output_path: str) -> Optional[str]:
+    """
+    Compile the saved .mlpackage to a ready-to-load .mlmodelc.
+
+    Xcode's compile-at-build step is single-threaded and serialized
+    against the build graph, and loading a raw .mlpackage on device pays
+    a multi-second first-launch compile. Compiling here ships a
+    .mlmodelc the app loads directly. Requires the Core ML compiler
+    (macOS); skipped with a warning elsewhere.
+
+    Args:
+        output_path: Path to the saved .mlpackage
+
+    Returns:
+        Path to the compiled .mlmodelc, or None on failure
+    """
+    destination = output_path.replace(".mlpackage", ".mlmodelc")
+    print(f"\nCompiling to: {destination}")
+    try:
+        # coremltools 8.x compile_model() only accepts a protobuf spec,
+        # not a saved package path; the supported route is to load the
+        # package and copy its compiled artifact out of the load cache
+        # (the cached copy is deleted when the MLModel is collected).
+        loaded = ct.models.MLModel(output_path)
+        compiled_src = loaded.get_compiled_model_path()
+        if os.path.exists(destination):
+            shutil.rmtree(destination)
+        shutil.copytree(compiled_src, destination)
+    except Exception as e:
+        print(f"Warning: .mlmodelc compilation failed: {e}")
+        print("  (Xcode will compile the .mlpackage at build time instead)")
+        return None
+    return destination
+
+
+def benchmark_compute_units(
+    output_path: str,
+    input_shape: Tuple[int, int] = (512, 512),
+    num_runs: int = 20
+) -> None:
+    """
+    Measure prediction latency under each compute-unit option.
+
+    Under ALL, the Core ML scheduler can spill ops to the GPU that would
+    have stayed ANE-resident under CPU_AND_NE, so the fastest option
+    varies per SoC; measuring on the target machine beats guessing.
+
+    Args:
+        output_path: Path to the saved .mlpackage
+        input_shape: Input image (height, width)
+        num_runs: Timed predictions per compute-unit option
+    """
+    _lazy_import()
+    import time
+
+    height, width = input_shape
+    pixels = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+    test_image = Image.fromarray(pixels)
+
+    print(f"\nBenchmarking compute units ({num_runs} runs each)...")
+    options = [
+        ("CPU_AND_NE", ct.ComputeUnit.CPU_AND_NE),
+        ("ALL", ct.ComputeUnit.ALL),
+        ("CPU_ONLY", ct.ComputeUnit.CPU_ONLY),
+    ]
+    for name, units in options:
+        try:
+            model = ct.models.MLModel(
+                output_path, compute_units=units, **_mlmodel_load_kwargs()
+            )
+            model.predict({"image": test_image})  # warm-up / first compile
+            latencies = []
+            for _ in range(num_runs):
+                start = time.perf_counter()
+                model.predict({"image": test_image})
+                latencies.append(time.perf_counter() - start)
+            median_ms = sorted(latencies)[num_runs // 2] * 1000.0
+            print(f"  {name:12s} median: {median_ms:8.2f} ms")
+        except Exception as e:
+            print(f"  {name:12s} failed: {e}")
 
 
 def validate_coreml_model(
     mlmodel: ct.models.MLModel,
-    pytorch_model: nn.Module,
+    wrapped_model: nn.Module,
     input_shape: Tuple[int, int] = (512, 512),
-    tolerance: float = 1e-3
+    tolerance: float = 1e-3,
+    example_input: Optional[torch.Tensor] = None,
+    reference: Optional[torch.Tensor] = None
 ) -> bool:
     """
     Validate Core ML model output against PyTorch model.
 
     Args:
         mlmodel: Core ML model
-        pytorch_model: Original PyTorch model
+        wrapped_model: The SharpModelWrapper instance that was converted
         input_shape: Input image shape
         tolerance: Maximum allowed difference
+        example_input: Optional input tensor from convert_to_coreml;
+            reused so the PyTorch forward is not repeated
+        reference: Optional PyTorch output for example_input
 
     Returns:
         True if validation passes
     """
+    _lazy_import()
     print("\nValidating Core ML model...")
 
-    # Create test input
-    test_input = create_example_input(input_shape[0], input_shape[1])
-    test_input_np = test_input.numpy()
+    # Test input. Core ML takes an 8-bit PIL image (the ImageType input
+    # normalizes pixels to [0, 1] in the preprocessing stage); the PyTorch
+    # reference sees the equivalent normalized float tensor. When
+    # convert_to_coreml already produced an (input, reference) pair for
+    # the same shape, reuse it instead of running another forward pass.
+    if example_input is None or reference is None:
+        height, width = input_shape
+        pixels = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+        test_input = torch.from_numpy(
+            pixels.astype(np.float32).transpose(2, 0, 1)[None] / 255.0
+        )
 
-    # PyTorch inference
-    pytorch_model.eval()
-    with torch.no_grad():
-        wrapped = SharpModelWrapper(pytorch_model)
-        pt_positions, pt_colors, pt_opacities, pt_scales, pt_rotations = wrapped(test_input)
+        # Run the reference under FP16 autocast: the mlprogram executes at
+        # FP16 on GPU/ANE by default, so an FP32 reference structurally
+        # guarantees precision noise and forces the tolerance up, masking
+        # real conversion bugs.
+        with torch.no_grad(), \
+                torch.autocast(device_type="cpu", dtype=torch.float16):
+            pt_gaussians = wrapped_model(test_input)
+    else:
+        test_input = example_input
+        pt_gaussians = reference
+        pixels = (
+            (test_input[0] * 255).round().to(torch.uint8)
+            .permute(1, 2, 0).numpy()
+        )
+    test_image = Image.fromarray(pixels)
 
     # Core ML inference
-    coreml_input = {"image": test_input_np}
+    coreml_input = {"image": test_image}
     coreml_output = mlmodel.predict(coreml_input)
 
-    # Compare outputs
-    outputs = [
-        ("positions", pt_positions),
-        ("colors", pt_colors),
-        ("opacities", pt_opacities),
-        ("scales", pt_scales),
-        ("rotations", pt_rotations)
-    ]
+    # Compare fused outputs: one abs-diff pass over the contiguous (1, N,
+    # 14) buffer plus two axis reductions, instead of dispatching separate
+    # tiny kernels per parameter slice
+    pt_np = pt_gaussians.float().numpy()
+    coreml_np = coreml_output["gaussians"]
 
-    all_passed = True
-    for name, pt_tensor in outputs:
-        pt_np = pt_tensor.numpy()
-        coreml_np = coreml_output[name]
+    abs_diff = np.abs(pt_np - coreml_np)
+    max_per_channel = abs_diff.max(axis=(0, 1))    # (14,)
+    mean_per_channel = abs_diff.mean(axis=(0, 1))  # (14,)
 
-        max_diff = np.max(np.abs(pt_np - coreml_np))
-        mean_diff = np.mean(np.abs(pt_np - coreml_np))
+    all_passed = True
+    for name, start, stop in GAUSSIAN_SLICES:
+        max_diff = max_per_channel[start:stop].max()
+        mean_diff = mean_per_channel[start:stop].mean()
 
         passed = max_diff < tolerance
         status = "✓" if passed else "✗"
@@ -402,14 +1001,57 @@ Examples:
         "--compute-units",
         type=str,
         choices=["ALL", "CPU_AND_NE", "CPU_ONLY"],
-        default="ALL",
-        help="Compute units (default: ALL for Neural Engine + GPU)"
+        default="CPU_AND_NE",
+        help="Compute units (default: CPU_AND_NE to keep the model "
+             "ANE-resident; use --benchmark-compute-units to measure)"
+    )
+
+    parser.add_argument(
+        "--benchmark-compute-units",
+        action="store_true",
+        help="Measure prediction latency under each compute-unit option "
+             "after conversion"
     )
 
     parser.add_argument(
         "--quantize",
         action="store_true",
-        help="Apply INT8 quantization for smaller model size"
+        help="Apply weight compression for smaller model size"
+    )
+
+    parser.add_argument(
+        "--quant-mode",
+        type=str,
+        choices=["int8", "int4", "palettize"],
+        default="int8",
+        help="Compression regime used with --quantize: blockwise INT8 "
+             "or 4-bit palettization (default: int8)"
+    )
+
+    parser.add_argument(
+        "--preset",
+        type=str,
+        choices=["a8w4"],
+        default=None,
+        help="Joint-compression preset: a8w4 (int8 activations + 4-bit "
+             "weights) for A17 Pro / M4 class Neural Engines"
+    )
+
+    parser.add_argument(
+        "--calib-dir",
+        type=str,
+        default=None,
+        help="Directory of calibration images for --preset a8w4 "
+             "(default: random samples)"
+    )
+
+    parser.add_argument(
+        "--precision",
+        type=str,
+        choices=["fp16", "fp32"],
+        default="fp16",
+        help="Compute precision (default: fp16; the ANE requires FP16 or "
+             "int8, fp32 is for debugging)"
     )
 
     parser.add_argument(
@@ -437,6 +1079,9 @@ Examples:
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
 
+    # Heavy imports happen here, after argparse and the cheap input checks
+    _lazy_import()
+
     # Map compute units
     compute_units_map = {
         "ALL": ct.ComputeUnit.ALL,
@@ -445,26 +1090,46 @@ Examples:
     }
     compute_units = compute_units_map[args.compute_units]
 
+    if args.compute_units == "ALL":
+        print("Warning: ALL lets the scheduler spill ANE-resident ops to "
+              "the GPU; CPU_AND_NE is often faster for this model. Use "
+              "--benchmark-compute-units to measure on your machine.")
+
     try:
-        # Load PyTorch model
+        # Load PyTorch model and wrap it once; conversion and validation
+        # share the same instance
         pytorch_model = load_pytorch_model(args.input)
+        wrapped_model = SharpModelWrapper(pytorch_model).eval()
 
         # Convert to Core ML
-        mlmodel = convert_to_coreml(
-            pytorch_model,
+        mlmodel, example_input, pt_ref = convert_to_coreml(
+            wrapped_model,
             args.output,
             input_shape=(args.height, args.width),
             compute_units=compute_units,
-            quantize=args.quantize
+            quantize=args.quantize,
+            quant_mode=args.quant_mode,
+            preset=args.preset,
+            calib_dir=args.calib_dir,
+            load_after_convert=not args.skip_validation,
+            precision=args.precision
         )
 
+        # Benchmark compute units on the saved package
+        if args.benchmark_compute_units:
+            benchmark_compute_units(
+                args.output, input_shape=(args.height, args.width)
+            )
+
         # Validate
         if not args.skip_validation:
             validate_coreml_model(
                 mlmodel,
-                pytorch_model,
+                wrapped_model,
                 input_shape=(args.height, args.width),
-                tolerance=args.tolerance
+                tolerance=args.tolerance,
+                example_input=example_input,
+                reference=pt_ref
             )
 
         print(f"\n{'='*60}")
@@ -472,9 +1137,9 @@ Examples:
         print(f"{'='*60}")
         print(f"\nOutput: {args.output}")
         print(f"\nNext steps:")
-        print(f"  1. Copy model to: src/addons/apple_native/ofxSharp/models/")
-        print(f"  2. Compile .mlpackage to .mlmodelc (Xcode does this automatically)")
-        print(f"  3. Load in ofxSharp:")
+        print(f"  1. Copy the .mlmodelc (compiled above) to: "
+              f"src/addons/apple_native/ofxSharp/models/")
+        print(f"  2. Load in ofxSharp:")
         print(f"     Sharp::SharpModel model;")
         print(f"     model.load(\"sharp.mlmodelc\");")
 